@@ -1,5 +1,5 @@
 use log::{error, info, warn};
-use std::process::Command;
+use std::process::{Command, Stdio};
 use crate::config::ActionConfig;
 
 pub trait Action: Send + Sync {
@@ -8,46 +8,44 @@ pub trait Action: Send + Sync {
 
 pub struct ShutdownAction {
     config: ActionConfig,
-    os: &'static str,
+    // Fixed by the OS and config, so built once up front
+    command: Result<Vec<String>, String>,
 }
 
 impl ShutdownAction {
     pub fn new(config: ActionConfig) -> Self {
-        Self {
-            config,
-            os: std::env::consts::OS,
-        }
+        let command = Self::get_shutdown_command(&config, std::env::consts::OS);
+        Self { config, command }
     }
 
-    fn get_shutdown_command(&self) -> Result<Vec<String>, Box<dyn std::error::Error>> {
+    fn get_shutdown_command(config: &ActionConfig, os: &str) -> Result<Vec<String>, String> {
         let mut cmd = Vec::new();
-        match self.os {
+        match os {
             "linux" => {
                 cmd.push("shutdown".to_string());
-                if self.config.force {
+                if config.force {
                     cmd.push("-f".to_string());
                 }
                 cmd.push("-h".to_string());
-                cmd.push(format!("+{}", self.config.delay_seconds / 60));
+                cmd.push(format!("+{}", config.delay_seconds / 60));
             }
             "windows" => {
                 cmd.push("shutdown".to_string());
                 cmd.push("/s".to_string());
-                if self.config.force {
+                if config.force {
                     cmd.push("/f".to_string());
                 }
                 cmd.push("/t".to_string());
-                cmd.push(self.config.delay_seconds.to_string());
+                cmd.push(config.delay_seconds.to_string());
             }
             "macos" => {
                 cmd.push("shutdown".to_string());
                 cmd.push("-h".to_string());
-                let delay_mins = std::cmp::max(1, self.config.delay_seconds / 60);
+                let delay_mins = std::cmp::max(1, config.delay_seconds / 60);
                 cmd.push(format!("+{}", delay_mins));
             }
             _ => {
-                error!("Unsupported operating system: {}", self.os);
-                return Err(format!("Shutdown not implemented for {}", self.os).into());
+                return Err(format!("Shutdown not implemented for {}", os));
             }
         }
         Ok(cmd)
@@ -61,7 +59,7 @@ impl Action for ShutdownAction {
             return true;
         }
 
-        let cmd_args = match self.get_shutdown_command() {
+        let cmd_args = match &self.command {
             Ok(c) => c,
             Err(e) => {
                 error!("Failed to generate shutdown command: {}", e);
@@ -84,8 +82,10 @@ impl Action for ShutdownAction {
         );
 
 
+        // Only stderr is reported on failure, so stdout is not captured
         let output = Command::new(cmd_name)
             .args(args)
+            .stdout(Stdio::null())
             .output();
 
         match output {
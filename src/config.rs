@@ -59,6 +59,8 @@ pub struct EmailConfig {
     pub recipients: Vec<String>,
     #[serde(default = "default_true")]
     pub use_tls: bool,
+    #[serde(default = "default_email_max_messages")]
+    pub max_messages_per_connection: u32, // reconnect after this many mails
 }
 
 fn default_true() -> bool {
@@ -82,6 +84,9 @@ fn default_email_sender() -> String {
 fn default_email_recipients() -> Vec<String> {
     vec!["admin@example.com".to_string()]
 }
+fn default_email_max_messages() -> u32 {
+    100
+}
 
 impl Default for EmailConfig {
     fn default() -> Self {
@@ -94,6 +99,7 @@ impl Default for EmailConfig {
             sender: default_email_sender(),
             recipients: default_email_recipients(),
             use_tls: true,
+            max_messages_per_connection: default_email_max_messages(),
         }
     }
 }
@@ -196,6 +202,8 @@ pub struct MonitorConfig {
     pub check_interval: u64,
     #[serde(default)]
     pub interface: Option<String>,
+    #[serde(default = "default_cache_ttl")]
+    pub cache_ttl: u64, // seconds vnstat output is reused; 0 disables caching
     #[serde(default)]
     pub reporting: ReportConfig,
 }
@@ -203,12 +211,16 @@ pub struct MonitorConfig {
 fn default_check_interval() -> u64 {
     300
 }
+fn default_cache_ttl() -> u64 {
+    60
+}
 
 impl Default for MonitorConfig {
     fn default() -> Self {
         Self {
             check_interval: default_check_interval(),
             interface: None,
+            cache_ttl: default_cache_ttl(),
             reporting: ReportConfig::default(),
         }
     }
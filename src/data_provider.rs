@@ -1,9 +1,17 @@
-use std::process::Command;
+use std::process::{Child, Command, Stdio};
 use std::collections::HashMap;
+use std::sync::{Arc, Mutex, OnceLock};
+use std::time::{Duration, Instant};
 use log::{debug, error};
-use chrono::Local;
+use chrono::{Datelike, Duration as ChronoDuration, Local, NaiveDate, Timelike};
 use serde::Deserialize;
 
+const BYTES_PER_GB: f64 = (1u64 << 30) as f64;
+// Minutes after midnight before yesterday's vnstat totals are treated as final
+const PAST_DAYS_SETTLE_MINUTES: u32 = 10;
+// A hung `vnstat --version` must not block startup indefinitely
+const VNSTAT_VERIFY_TIMEOUT: Duration = Duration::from_secs(2);
+
 #[derive(Deserialize, Debug)]
 struct VnStatOutput {
     interfaces: Vec<Interface>,
@@ -50,8 +58,18 @@ struct DayDate {
     day: u32,
 }
 
+static VNSTAT_AVAILABLE: OnceLock<bool> = OnceLock::new();
+
 pub struct VnStatDataProvider {
     interface: Option<String>,
+    // `-i <iface>` prefix shared by every vnstat invocation, validated once
+    interface_args: Vec<String>,
+    cache_ttl: Duration,
+    // Last decoded `vnstat --json m` output and when it was fetched
+    month_snapshot: Mutex<Option<(Instant, Arc<VnStatOutput>)>>,
+    // Usage of completed days, which no longer change, kept for the date it
+    // was built on together with how many days back it covers
+    past_days: Mutex<Option<(NaiveDate, u32, HashMap<String, f64>)>>,
 }
 
 fn is_safe_interface(iface: &str) -> bool {
@@ -63,34 +81,61 @@ fn is_safe_interface(iface: &str) -> bool {
 }
 
 impl VnStatDataProvider {
-    pub fn new(interface: Option<String>) -> Result<Self, Box<dyn std::error::Error>> {
-        let provider = Self { interface };
-        provider.verify_vnstat()?;
+    pub fn new(interface: Option<String>, cache_ttl: Duration) -> Result<Self, Box<dyn std::error::Error>> {
+        let mut provider = Self::build(interface)?;
+        provider.cache_ttl = cache_ttl;
+        Self::verify_vnstat()?;
         Ok(provider)
     }
 
-    fn verify_vnstat(&self) -> Result<(), Box<dyn std::error::Error>> {
-        let output = Command::new("vnstat")
-            .arg("--version")
-            .output();
-        match output {
-            Ok(out) if out.status.success() => Ok(()),
-            _ => {
-                error!("vnstat is not installed or not in PATH");
-                Err("vnstat not installed or not in PATH".into())
+    fn build(interface: Option<String>) -> Result<Self, Box<dyn std::error::Error>> {
+        let interface_args = match interface {
+            Some(ref iface) => {
+                if !is_safe_interface(iface) {
+                    return Err(format!("Unsafe interface name configured: {}", iface).into());
+                }
+                vec!["-i".to_string(), iface.clone()]
             }
-        }
+            None => Vec::new(),
+        };
+        Ok(Self {
+            interface,
+            interface_args,
+            cache_ttl: Duration::ZERO,
+            month_snapshot: Mutex::new(None),
+            past_days: Mutex::new(None),
+        })
     }
 
-    fn run_vnstat_command(&self, args: &[&str]) -> Result<String, Box<dyn std::error::Error>> {
-        let mut cmd = Command::new("vnstat");
-        if let Some(ref iface) = self.interface {
-            if !is_safe_interface(iface) {
-                return Err(format!("Unsafe interface name configured: {}", iface).into());
+    fn verify_vnstat() -> Result<(), Box<dyn std::error::Error>> {
+        if std::env::var_os("VNSTAT_SKIP_VERIFY").is_some_and(|v| v == "1") {
+            return Ok(());
+        }
+
+        // The probe result cannot change during the process, so spawn it once
+        let available = *VNSTAT_AVAILABLE.get_or_init(|| {
+            // Only the exit status matters, so the version banner is discarded
+            let child = Command::new("vnstat")
+                .arg("--version")
+                .stdout(Stdio::null())
+                .stderr(Stdio::null())
+                .spawn();
+            match child {
+                Ok(mut child) => wait_with_timeout(&mut child, VNSTAT_VERIFY_TIMEOUT),
+                Err(_) => false,
             }
-            cmd.arg("-i").arg(iface);
+        });
+        if available {
+            Ok(())
+        } else {
+            error!("vnstat is not installed or not in PATH");
+            Err("vnstat not installed or not in PATH".into())
         }
-        cmd.args(args);
+    }
+
+    fn run_vnstat_command(&self, args: &[&str]) -> Result<Vec<u8>, Box<dyn std::error::Error>> {
+        let mut cmd = Command::new("vnstat");
+        cmd.args(&self.interface_args).args(args);
 
         debug!("Running command: vnstat {:?}", args);
         let output = cmd.output()?;
@@ -101,49 +146,50 @@ impl VnStatDataProvider {
             return Err(format!("vnstat command failed: {}", stderr).into());
         }
 
-        Ok(String::from_utf8_lossy(&output.stdout).to_string())
+        // Hand the raw bytes to serde_json, which validates UTF-8 only inside strings
+        Ok(output.stdout)
     }
 
-    pub fn get_current_month_usage(&self) -> Result<f64, Box<dyn std::error::Error>> {
-        let output = self.run_vnstat_command(&["--json", "m"])?;
-        debug!("vnstat --json m output:\n{}", output);
-
-        let now = Local::now();
-        let current_month = now.format("%Y-%m").to_string();
-        self.parse_monthly_usage_from_output(&output, &current_month)
-    }
-
-    pub fn parse_monthly_usage_from_output(&self, output: &str, current_month: &str) -> Result<f64, Box<dyn std::error::Error>> {
-        let parts: Vec<&str> = current_month.split('-').collect();
-        if parts.len() != 2 {
-            return Err("Invalid current_month format".into());
+    /// Runs `vnstat --json m` and reuses the decoded result until it is older
+    /// than the cache TTL.
+    fn fetch_months(&self) -> Result<Arc<VnStatOutput>, Box<dyn std::error::Error>> {
+        if let Ok(snapshot) = self.month_snapshot.lock() {
+            if let Some((fetched_at, ref data)) = *snapshot {
+                if fetched_at.elapsed() < self.cache_ttl {
+                    debug!("Using cached vnstat monthly output");
+                    return Ok(Arc::clone(data));
+                }
+            }
         }
-        let target_year: i32 = parts[0].parse()?;
-        let target_month: u32 = parts[1].parse()?;
 
-        let data: VnStatOutput = match serde_json::from_str(output) {
-            Ok(d) => d,
-            Err(e) => {
-                if output.contains("No data") {
-                    debug!("vnstat database has no data yet.");
-                    return Ok(0.0);
-                }
-                return Err(e.into());
+        let output = self.run_vnstat_command(&["--json", "m"])?;
+        debug!("vnstat --json m output:\n{}", String::from_utf8_lossy(&output));
+        let data = Arc::new(decode_output(&output)?);
+
+        if !self.cache_ttl.is_zero() {
+            if let Ok(mut snapshot) = self.month_snapshot.lock() {
+                *snapshot = Some((Instant::now(), Arc::clone(&data)));
             }
-        };
+        }
+        Ok(data)
+    }
 
+    fn select_interface<'a>(&self, data: &'a VnStatOutput) -> Option<&'a Interface> {
         let interface = if let Some(ref iface) = self.interface {
             data.interfaces.iter().find(|i| &i.name == iface)
         } else {
             data.interfaces.first()
         };
+        if interface.is_none() {
+            debug!("No matching interface found in vnstat output.");
+        }
+        interface
+    }
 
-        let interface = match interface {
+    fn month_usage(&self, data: &VnStatOutput, target_year: i32, target_month: u32) -> f64 {
+        let interface = match self.select_interface(data) {
             Some(i) => i,
-            None => {
-                debug!("No matching interface found in vnstat output.");
-                return Ok(0.0);
-            }
+            None => return 0.0,
         };
 
         let month_data = interface.traffic.month.iter().find(|m| {
@@ -152,58 +198,132 @@ impl VnStatDataProvider {
 
         match month_data {
             Some(m) => {
-                let total_bytes = m.rx + m.tx;
-                let total_gb = total_bytes as f64 / (1024.0 * 1024.0 * 1024.0);
-                debug!("Found current month ({}) usage: {} GB", current_month, total_gb);
-                Ok(total_gb)
+                let total_gb = (m.rx + m.tx) as f64 / BYTES_PER_GB;
+                debug!("Found current month ({:04}-{:02}) usage: {} GB", target_year, target_month, total_gb);
+                total_gb
             }
             None => {
-                debug!("No usage data found for month {} in vnstat output.", current_month);
-                Ok(0.0)
+                debug!("No usage data found for month {:04}-{:02} in vnstat output.", target_year, target_month);
+                0.0
             }
         }
     }
 
-    pub fn get_daily_usage(&self, _days: u32) -> Result<HashMap<String, f64>, Box<dyn std::error::Error>> {
-        let output = self.run_vnstat_command(&["--json", "d"])?;
-        self.parse_daily_usage_from_output(&output)
+    fn daily_usage(&self, data: &VnStatOutput) -> HashMap<String, f64> {
+        let interface = match self.select_interface(data) {
+            Some(i) => i,
+            None => return HashMap::new(),
+        };
+
+        // collect() sizes the map from the slice length up front
+        interface
+            .traffic
+            .day
+            .iter()
+            .map(|d| {
+                let date_str = format!("{:04}-{:02}-{:02}", d.date.year, d.date.month, d.date.day);
+                (date_str, (d.rx + d.tx) as f64 / BYTES_PER_GB)
+            })
+            .collect()
     }
 
-    pub fn parse_daily_usage_from_output(&self, output: &str) -> Result<HashMap<String, f64>, Box<dyn std::error::Error>> {
-        let data: VnStatOutput = match serde_json::from_str(output) {
-            Ok(d) => d,
-            Err(e) => {
-                if output.contains("No data") {
-                    debug!("vnstat database has no data yet.");
-                    return Ok(HashMap::new());
-                }
-                return Err(e.into());
-            }
-        };
+    pub fn get_current_month_usage(&self) -> Result<f64, Box<dyn std::error::Error>> {
+        let data = self.fetch_months()?;
 
-        let interface = if let Some(ref iface) = self.interface {
-            data.interfaces.iter().find(|i| &i.name == iface)
-        } else {
-            data.interfaces.first()
+        let now = Local::now();
+        Ok(self.month_usage(&data, now.year(), now.month()))
+    }
+
+    #[cfg(test)]
+    fn parse_monthly_usage_from_output(&self, output: &str, current_month: &str) -> Result<f64, Box<dyn std::error::Error>> {
+        let parts: Vec<&str> = current_month.split('-').collect();
+        if parts.len() != 2 {
+            return Err("Invalid current_month format".into());
+        }
+        let target_year: i32 = parts[0].parse()?;
+        let target_month: u32 = parts[1].parse()?;
+
+        let data = decode_output(output.as_bytes())?;
+        Ok(self.month_usage(&data, target_year, target_month))
+    }
+
+    /// Returns per-day usage in GB for the `days` completed days before today.
+    pub fn get_daily_usage(&self, days: u32) -> Result<HashMap<String, f64>, Box<dyn std::error::Error>> {
+        let now = Local::now();
+        let today = now.date_naive();
+        // ISO dates order lexically, so the cutoff is a plain string comparison
+        let cutoff = (today - ChronoDuration::days(days as i64)).to_string();
+        let select = |past_days: &HashMap<String, f64>| -> HashMap<String, f64> {
+            past_days
+                .iter()
+                .filter(|(date, _)| **date >= cutoff)
+                .map(|(date, usage)| (date.clone(), *usage))
+                .collect()
         };
 
-        let interface = match interface {
-            Some(i) => i,
-            None => {
-                debug!("No matching interface found in vnstat output.");
-                return Ok(HashMap::new());
+        if let Ok(cache) = self.past_days.lock() {
+            if let Some((cached_for, covered, ref past_days)) = *cache {
+                if cached_for == today && covered >= days {
+                    return Ok(select(past_days));
+                }
             }
-        };
+        }
+
+        // Ask vnstat for just the requested days plus today
+        let limit = (days + 1).to_string();
+        let output = self.run_vnstat_command(&["--json", "d", &limit])?;
+        debug!("vnstat --json d {} output:\n{}", limit, String::from_utf8_lossy(&output));
+        let data = decode_output(&output)?;
+        let today_str = today.to_string();
+        let mut past_days = self.daily_usage(&data);
+        past_days.retain(|date, _| *date < today_str);
+        let selected = select(&past_days);
+
+        // vnstat may still be flushing yesterday's last minutes right after
+        // midnight, so only freeze the completed days once that has settled.
+        if now.hour() > 0 || now.minute() >= PAST_DAYS_SETTLE_MINUTES {
+            if let Ok(mut cache) = self.past_days.lock() {
+                *cache = Some((today, days, past_days));
+            }
+        }
+        Ok(selected)
+    }
 
-        let mut daily_usage = HashMap::new();
-        for d in &interface.traffic.day {
-            let date_str = format!("{:04}-{:02}-{:02}", d.date.year, d.date.month, d.date.day);
-            let total_bytes = d.rx + d.tx;
-            let total_gb = total_bytes as f64 / (1024.0 * 1024.0 * 1024.0);
-            daily_usage.insert(date_str, total_gb);
+    #[cfg(test)]
+    fn parse_daily_usage_from_output(&self, output: &str) -> Result<HashMap<String, f64>, Box<dyn std::error::Error>> {
+        let data = decode_output(output.as_bytes())?;
+        Ok(self.daily_usage(&data))
+    }
+}
+
+/// Wait for `child` to exit successfully within `timeout`, killing it if it
+/// does not.
+fn wait_with_timeout(child: &mut Child, timeout: Duration) -> bool {
+    let deadline = Instant::now() + timeout;
+    loop {
+        match child.try_wait() {
+            Ok(Some(status)) => return status.success(),
+            Ok(None) if Instant::now() < deadline => std::thread::sleep(Duration::from_millis(20)),
+            _ => {
+                let _ = child.kill();
+                let _ = child.wait();
+                return false;
+            }
         }
+    }
+}
 
-        Ok(daily_usage)
+fn decode_output(output: &[u8]) -> Result<VnStatOutput, Box<dyn std::error::Error>> {
+    const NO_DATA: &[u8] = b"No data";
+    match serde_json::from_slice(output) {
+        Ok(d) => Ok(d),
+        Err(e) => {
+            if output.windows(NO_DATA.len()).any(|w| w == NO_DATA) {
+                debug!("vnstat database has no data yet.");
+                return Ok(VnStatOutput { interfaces: Vec::new() });
+            }
+            Err(e.into())
+        }
     }
 }
 
@@ -213,7 +333,7 @@ mod tests {
 
     #[test]
     fn test_parse_monthly_usage() {
-        let provider = VnStatDataProvider { interface: None };
+        let provider = VnStatDataProvider::build(None).unwrap();
         let sample = r#"{
             "interfaces": [
                 {
@@ -237,7 +357,7 @@ mod tests {
 
     #[test]
     fn test_parse_daily_usage() {
-        let provider = VnStatDataProvider { interface: None };
+        let provider = VnStatDataProvider::build(None).unwrap();
         let sample = r#"{
             "interfaces": [
                 {
@@ -267,7 +387,7 @@ mod tests {
 
     #[test]
     fn test_parse_monthly_usage_no_data() {
-        let provider = VnStatDataProvider { interface: None };
+        let provider = VnStatDataProvider::build(None).unwrap();
         let sample = " eth0: No data. Timestamp of last update is same 2026-05-24 00:32:18 as of database creation.";
         let usage = provider.parse_monthly_usage_from_output(sample, "2026-05").unwrap();
         assert_eq!(usage, 0.0);
@@ -275,10 +395,50 @@ mod tests {
 
     #[test]
     fn test_parse_daily_usage_no_data() {
-        let provider = VnStatDataProvider { interface: None };
+        let provider = VnStatDataProvider::build(None).unwrap();
         let sample = " eth0: No data. Timestamp of last update is same 2026-05-24 00:32:18 as of database creation.";
         let daily = provider.parse_daily_usage_from_output(sample).unwrap();
         assert!(daily.is_empty());
     }
-}
 
+    #[test]
+    fn test_rejects_unsafe_interface() {
+        assert!(VnStatDataProvider::build(Some("eth0; rm -rf /".to_string())).is_err());
+        assert!(VnStatDataProvider::build(Some("ens5".to_string())).is_ok());
+    }
+
+    #[test]
+    fn test_parse_combined_output() {
+        let provider = VnStatDataProvider::build(None).unwrap();
+        let sample = r#"{
+            "interfaces": [
+                {
+                    "name": "ens5",
+                    "traffic": {
+                        "hour": [],
+                        "day": [
+                            {
+                                "date": { "year": 2025, "month": 4, "day": 12 },
+                                "rx": 4445291151,
+                                "tx": 4445291152
+                            }
+                        ],
+                        "month": [
+                            {
+                                "date": { "year": 2025, "month": 4 },
+                                "rx": 55268207206,
+                                "tx": 54468207207
+                            }
+                        ],
+                        "top": []
+                    }
+                }
+            ]
+        }"#;
+
+        let usage = provider.parse_monthly_usage_from_output(sample, "2025-04").unwrap();
+        assert!((usage - 102.20).abs() < 1e-5);
+        let daily = provider.parse_daily_usage_from_output(sample).unwrap();
+        assert!((daily.get("2025-04-12").unwrap() - 8.28).abs() < 1e-5);
+    }
+}
@@ -3,9 +3,12 @@ use log::{info, error, LevelFilter};
 use std::path::{Path, PathBuf};
 use std::sync::Arc;
 use std::fs;
+use std::io::{self, Write};
+use std::time::Duration;
 
 mod config;
 mod data_provider;
+mod fs_util;
 mod state_manager;
 mod notifier;
 mod action;
@@ -206,16 +209,14 @@ fn install_systemd_service(config_path: &Path) -> Result<(), Box<dyn std::error:
     );
 
     let service_file = format!("/etc/systemd/system/{}.service", SERVICE_NAME);
-    fs::write(&service_file, service_content)?;
+    // A crash mid-write must not leave a truncated unit for daemon-reload
+    fs_util::write_atomic(Path::new(&service_file), service_content.as_bytes())?;
 
     println!("Reloading systemd...");
     Command::new("systemctl").arg("daemon-reload").status()?;
 
-    println!("Enabling service...");
-    Command::new("systemctl").arg("enable").arg(SERVICE_NAME).status()?;
-
-    println!("Starting service...");
-    Command::new("systemctl").arg("start").arg(SERVICE_NAME).status()?;
+    println!("Enabling and starting service...");
+    Command::new("systemctl").args(["enable", "--now", SERVICE_NAME]).status()?;
 
     println!("✅ Service installed and started successfully!");
     println!("   Service file: {}", service_file);
@@ -238,11 +239,8 @@ fn uninstall_systemd_service() -> Result<(), Box<dyn std::error::Error>> {
 
     let service_file = format!("/etc/systemd/system/{}.service", SERVICE_NAME);
 
-    println!("Stopping service...");
-    let _ = Command::new("systemctl").arg("stop").arg(SERVICE_NAME).status();
-
-    println!("Disabling service...");
-    let _ = Command::new("systemctl").arg("disable").arg(SERVICE_NAME).status();
+    println!("Stopping and disabling service...");
+    let _ = Command::new("systemctl").args(["disable", "--now", SERVICE_NAME]).status();
 
     if Path::new(&service_file).exists() {
         println!("Removing service file...");
@@ -289,7 +287,7 @@ fn run_app(cli: Cli) -> Result<(), Box<dyn std::error::Error>> {
             };
 
             // Create config if not exists or override parameters are passed
-            if !config_path.exists()
+            let created_config = if !config_path.exists()
                 || discord.is_some()
                 || email_server.is_some()
                 || limit.is_some()
@@ -338,7 +336,10 @@ fn run_app(cli: Cli) -> Result<(), Box<dyn std::error::Error>> {
 
                 save_settings(&app_config, &config_path)?;
                 info!("✅ Configuration saved.");
-            }
+                Some(app_config)
+            } else {
+                None
+            };
 
             if install {
                 install_systemd_service(&config_path)?;
@@ -357,8 +358,11 @@ fn run_app(cli: Cli) -> Result<(), Box<dyn std::error::Error>> {
                 None
             };
 
-            // Load settings
-            let app_config = load_settings(&config_path)?;
+            // Load settings, unless they were just written from the command line
+            let app_config = match created_config {
+                Some(app_config) => app_config,
+                None => load_settings(&config_path)?,
+            };
 
             if !app_config.notifiers.email.enabled && !app_config.notifiers.discord.enabled {
                 return Err("No notification methods enabled. Please configure email or Discord.".into());
@@ -381,7 +385,10 @@ fn run_app(cli: Cli) -> Result<(), Box<dyn std::error::Error>> {
 
             let notifier = Arc::new(multi_notifier);
             let action = Arc::new(ShutdownAction::new(app_config.action.clone()));
-            let data_provider = VnStatDataProvider::new(app_config.monitor.interface.clone())?;
+            let data_provider = VnStatDataProvider::new(
+                app_config.monitor.interface.clone(),
+                Duration::from_secs(app_config.monitor.cache_ttl),
+            )?;
             let state_manager = StateManager::new(None)?;
 
             let mut monitor = TrafficMonitor::new(
@@ -406,7 +413,10 @@ fn run_app(cli: Cli) -> Result<(), Box<dyn std::error::Error>> {
             };
 
             let app_config = load_settings(&config_path)?;
-            let data_provider = VnStatDataProvider::new(app_config.monitor.interface.clone())?;
+            let data_provider = VnStatDataProvider::new(
+                app_config.monitor.interface.clone(),
+                Duration::from_secs(app_config.monitor.cache_ttl),
+            )?;
             
             let current_usage = data_provider.get_current_month_usage()?;
             let percentage = (current_usage / app_config.thresholds.total_limit as f64) * 100.0;
@@ -445,8 +455,11 @@ fn run_app(cli: Cli) -> Result<(), Box<dyn std::error::Error>> {
                 return Err(format!("Configuration file not found: {:?}", config_path).into());
             }
 
-            let content = fs::read_to_string(config_path)?;
-            println!("{}", content);
+            // Stream straight to stdout rather than loading the file into a String
+            let mut file = fs::File::open(&config_path)?;
+            let mut out = io::stdout().lock();
+            io::copy(&mut file, &mut out)?;
+            writeln!(out)?;
         }
         Commands::State => {
             let state_manager = StateManager::new(None)?;
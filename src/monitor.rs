@@ -1,8 +1,11 @@
+use std::collections::HashMap;
+use std::fmt::Write;
 use std::sync::Arc;
-use std::thread;
-use std::time::Duration;
-use chrono::{Local, Datelike, NaiveDate, Duration as ChronoDuration, Timelike};
-use log::{info, debug, error};
+use std::sync::mpsc::{self, Receiver, SyncSender, TrySendError};
+use std::thread::{self, JoinHandle};
+use std::time::{Duration, Instant};
+use chrono::{DateTime, Local, Datelike, NaiveDate, Duration as ChronoDuration, Timelike};
+use log::{info, debug, error, warn};
 
 
 use crate::config::{ThresholdConfig, MonitorConfig};
@@ -11,6 +14,57 @@ use crate::state_manager::StateManager;
 use crate::notifier::Notifier;
 use crate::action::Action;
 
+fn days_in_month(year: i32, month: u32) -> u32 {
+    match month {
+        4 | 6 | 9 | 11 => 30,
+        2 if NaiveDate::from_ymd_opt(year, 2, 29).is_some() => 29,
+        2 => 28,
+        _ => 31,
+    }
+}
+
+/// The seven completed days before `today`, oldest first, with their usage
+/// in GB (0 for days vnstat has no entry for).
+fn trend_days(today: NaiveDate, daily_usage: &HashMap<String, f64>) -> impl Iterator<Item = (String, f64)> + '_ {
+    (1..=7).rev().map(move |i| {
+        let date = (today - ChronoDuration::days(i)).to_string();
+        let usage = daily_usage.get(&date).copied().unwrap_or(0.0);
+        (date, usage)
+    })
+}
+
+/// Warning thresholds every `interval` GB up to and including `total_limit`.
+fn threshold_ladder(config: &ThresholdConfig) -> Vec<u64> {
+    if config.interval == 0 {
+        return Vec::new();
+    }
+    (1..=config.total_limit / config.interval)
+        .map(|i| i * config.interval)
+        .collect()
+}
+
+/// Number of `thresholds` (a ladder from `threshold_ladder`) at or below
+/// `current_usage`.
+fn crossed_count(thresholds: &[u64], interval: f64, current_usage: f64) -> usize {
+    if interval <= 0.0 || current_usage <= 0.0 {
+        return 0;
+    }
+    ((current_usage / interval) as usize).min(thresholds.len())
+}
+
+// Bound on queued fire-and-forget notifications before senders fall back to
+// delivering synchronously.
+const NOTIFY_QUEUE_CAPACITY: usize = 128;
+
+type QueuedNotification = (String, String, &'static str);
+
+/// Deliver queued notifications in order until the sending side is dropped.
+fn notify_worker_loop(rx: Receiver<QueuedNotification>, notifier: Arc<dyn Notifier>) {
+    for (subject, message, level) in rx {
+        notifier.notify(&subject, &message, level);
+    }
+}
+
 pub struct TrafficMonitor {
     threshold_config: ThresholdConfig,
     notifier: Arc<dyn Notifier>,
@@ -22,6 +76,13 @@ pub struct TrafficMonitor {
     total_limit: f64, // GB
     interval: f64,    // GB
     critical_threshold: f64, // GB
+    warning_threshold: f64, // GB, usage at which reports are sent as warnings
+    thresholds: Vec<u64>, // GB, ascending warning thresholds up to total_limit
+    settings_footer: String, // static tail of the status summary
+
+    // Background delivery for notifications whose result does not affect state
+    notify_tx: Option<SyncSender<QueuedNotification>>,
+    notify_worker: Option<JoinHandle<()>>,
 }
 
 impl TrafficMonitor {
@@ -37,6 +98,27 @@ impl TrafficMonitor {
         let interval = threshold_config.interval as f64;
         let critical_percentage = threshold_config.critical_percentage as f64;
         let critical_threshold = (total_limit * critical_percentage) / 100.0;
+        let thresholds = threshold_ladder(&threshold_config);
+
+        let settings_footer = format!(
+            "\n\nTraffic Monitor Settings:\n\
+             ----------------------\n\
+             Total Traffic Limit: {}GB\n\
+             Warning Threshold Interval: Warning sent every {}GB\n\
+             Shutdown Threshold: {:.2}GB ({}%)\n\
+             Check Interval: {} seconds\n\n\
+             This is an automated notification email, please do not reply.\n",
+            total_limit, interval, critical_threshold,
+            threshold_config.critical_percentage, monitor_config.check_interval
+        );
+
+        let (notify_tx, notify_rx) = mpsc::sync_channel::<QueuedNotification>(NOTIFY_QUEUE_CAPACITY);
+        let worker_notifier = Arc::clone(&notifier);
+        let notify_worker = thread::Builder::new()
+            .name("notifier".to_string())
+            .spawn(move || notify_worker_loop(notify_rx, worker_notifier))
+            .map_err(|e| error!("Failed to start notification worker, sending inline: {}", e))
+            .ok();
 
         info!(
             "Initialized TrafficMonitor with total limit: {}GB, interval: {}GB, critical threshold: {}GB ({}%)",
@@ -53,40 +135,72 @@ impl TrafficMonitor {
             total_limit,
             interval,
             critical_threshold,
+            warning_threshold: total_limit * 0.7,
+            thresholds,
+            settings_footer,
+            notify_tx: notify_worker.as_ref().map(|_| notify_tx),
+            notify_worker,
         }
     }
 
-    fn should_notify(&self, current_usage: f64) -> Option<u64> {
+    /// Hand a notification to the background worker so a slow webhook or SMTP
+    /// server does not stall the check loop. Falls back to sending inline when
+    /// the queue is full or the worker is unavailable.
+    fn notify_async(&self, subject: String, message: String, level: &'static str) {
+        let item = match &self.notify_tx {
+            Some(tx) => match tx.try_send((subject, message, level)) {
+                Ok(()) => return,
+                Err(TrySendError::Full(item)) => {
+                    warn!("Notification queue full, sending inline");
+                    item
+                }
+                Err(TrySendError::Disconnected(item)) => item,
+            },
+            None => (subject, message, level),
+        };
+        self.notifier.notify(&item.0, &item.1, item.2);
+    }
+
+    /// Crossed thresholds that have not been notified yet, in ascending order.
+    fn should_notify(&self, current_usage: f64) -> Vec<u64> {
         let notified = self.state_manager.get_notified_thresholds();
-        let max_steps = (self.total_limit / self.interval) as u64;
+        self.thresholds[..crossed_count(&self.thresholds, self.interval, current_usage)]
+            .iter()
+            .filter(|threshold| !notified.contains(threshold))
+            .copied()
+            .collect()
+    }
 
-        for i in 1..=max_steps {
-            let threshold = i * (self.interval as u64);
-            if current_usage >= (threshold as f64) && !notified.contains(&threshold) {
-                return Some(threshold);
-            }
+    /// Notification level for reports at the given usage.
+    fn pick_level(&self, current_usage: f64) -> &'static str {
+        if current_usage >= self.critical_threshold {
+            "critical"
+        } else if current_usage >= self.warning_threshold {
+            "warning"
+        } else {
+            "info"
         }
-        None
     }
 
     fn is_critical(&self, current_usage: f64) -> bool {
         current_usage >= self.critical_threshold
     }
 
-    fn get_status_summary(&self, current_usage: f64) -> String {
+    /// Remaining days (including today), daily average, month-end estimate and
+    /// percentage of the limit used, for the month containing `now`.
+    fn month_stats(&self, now: &DateTime<Local>, current_usage: f64) -> (u32, f64, f64, f64) {
+        let day = now.day();
+        let remaining_days = days_in_month(now.year(), now.month()) - day + 1;
+        let daily_average = current_usage / day as f64;
+        let estimated_end_of_month = current_usage + daily_average * remaining_days as f64;
         let percentage = (current_usage / self.total_limit) * 100.0;
-        let now = Local::now();
-
-        // Calculate next threshold
-        let mut next_threshold = 0.0;
-        let max_steps = (self.total_limit / self.interval) as u64;
-        for i in 1..=max_steps {
-            let threshold = (i * (self.interval as u64)) as f64;
-            if current_usage < threshold {
-                next_threshold = threshold;
-                break;
-            }
-        }
+        (remaining_days, daily_average, estimated_end_of_month, percentage)
+    }
+
+    fn get_status_summary(&self, current_usage: f64, now: &DateTime<Local>) -> String {
+        // Next threshold: first ladder step above current usage (0 if none left)
+        let next_index = self.thresholds.partition_point(|&t| t as f64 <= current_usage);
+        let next_threshold = self.thresholds.get(next_index).map_or(0.0, |&t| t as f64);
 
         // Calculate remaining to critical
         let remaining_to_critical = if current_usage < self.critical_threshold {
@@ -95,19 +209,7 @@ impl TrafficMonitor {
             0.0
         };
 
-        // Remaining days in month
-        let current_year = now.year();
-        let current_month = now.month();
-        let next_month = if current_month == 12 { 1 } else { current_month + 1 };
-        let next_year = if current_month == 12 { current_year + 1 } else { current_year };
-        
-        let next_month_date = NaiveDate::from_ymd_opt(next_year, next_month, 1).unwrap_or_default();
-        let today_date = now.date_naive();
-        let remaining_days = (next_month_date - today_date).num_days();
-
-        // Estimate daily average
-        let daily_average = if now.day() > 0 { current_usage / (now.day() as f64) } else { current_usage };
-        let estimated_end_of_month = current_usage + (daily_average * (remaining_days as f64));
+        let (remaining_days, daily_average, estimated_end_of_month, percentage) = self.month_stats(now, current_usage);
 
         let mut summary = format!(
             "Traffic Monitoring System Status Report\n\n\
@@ -125,80 +227,56 @@ impl TrafficMonitor {
             summary.push_str("⚠️ Warning: Shutdown threshold exceeded!\n");
         }
 
-        summary.push_str(&format!(
+        let _ = write!(
+            summary,
             "\nDaily Average Usage: {:.2}GB/day\n\
              Remaining Days in Month: {} days\n\
              Estimated Month-End Total: {:.2}GB\n",
             daily_average, remaining_days, estimated_end_of_month
-        ));
+        );
 
         if next_threshold > 0.0 {
-            summary.push_str(&format!(
+            let _ = write!(
+                summary,
                 "\nTraffic until next threshold ({:.0}GB): {:.2}GB",
                 next_threshold,
                 next_threshold - current_usage
-            ));
+            );
         }
 
         if remaining_to_critical > 0.0 {
-            summary.push_str(&format!(
+            let _ = write!(
+                summary,
                 "\nTraffic until shutdown threshold ({:.2}GB): {:.2}GB",
                 self.critical_threshold, remaining_to_critical
-            ));
+            );
         }
 
         if self.monitor_config.reporting.include_traffic_trend {
             if let Ok(daily_usage) = self.data_provider.get_daily_usage(7) {
                 if !daily_usage.is_empty() {
                     summary.push_str("\n\nLast 7 Days Traffic Trend:");
-                    for i in (1..=7).rev() {
-                        let date = (now - ChronoDuration::days(i)).format("%Y-%m-%d").to_string();
-                        let usage = daily_usage.get(&date).copied().unwrap_or(0.0);
-                        summary.push_str(&format!("\n- {}: {:.2}GB", date, usage));
+                    for (date, usage) in trend_days(now.date_naive(), &daily_usage) {
+                        let _ = write!(summary, "\n- {}: {:.2}GB", date, usage);
                     }
                 }
             }
         }
 
-        summary.push_str(&format!(
-            "\n\nTraffic Monitor Settings:\n\
-             ----------------------\n\
-             Total Traffic Limit: {}GB\n\
-             Warning Threshold Interval: Warning sent every {}GB\n\
-             Shutdown Threshold: {:.2}GB ({}%)\n\
-             Check Interval: {} seconds\n\n\
-             This is an automated notification email, please do not reply.\n",
-            self.total_limit,
-            self.interval,
-            self.critical_threshold,
-            self.threshold_config.critical_percentage,
-            self.monitor_config.check_interval
-        ));
+        summary.push_str(&self.settings_footer);
 
         summary
     }
 
-    fn get_daily_report(&self) -> String {
-        let now = Local::now();
-        let current_usage = self.data_provider.get_current_month_usage().unwrap_or(0.0);
-        let yesterday = now - ChronoDuration::days(1);
-        let yesterday_str = yesterday.format("%Y-%m-%d").to_string();
+    fn get_daily_report(&self, current_usage: f64, now: &DateTime<Local>) -> String {
+        let yesterday_str = (now.date_naive() - ChronoDuration::days(1)).to_string();
 
-        let daily_usage = self.data_provider.get_daily_usage(30).unwrap_or_default();
+        // Only yesterday and, if enabled, the 7-day trend are shown
+        let days = if self.monitor_config.reporting.include_traffic_trend { 7 } else { 1 };
+        let daily_usage = self.data_provider.get_daily_usage(days).unwrap_or_default();
         let yesterday_usage = daily_usage.get(&yesterday_str).copied().unwrap_or(0.0);
 
-        let daily_average = if now.day() > 0 { current_usage / (now.day() as f64) } else { current_usage };
-        
-        let current_year = now.year();
-        let current_month = now.month();
-        let next_month = if current_month == 12 { 1 } else { current_month + 1 };
-        let next_year = if current_month == 12 { current_year + 1 } else { current_year };
-        let next_month_date = NaiveDate::from_ymd_opt(next_year, next_month, 1).unwrap_or_default();
-        let today_date = now.date_naive();
-        let remaining_days = (next_month_date - today_date).num_days();
-
-        let estimated_end_of_month = current_usage + (daily_average * (remaining_days as f64));
-        let percentage = (current_usage / self.total_limit) * 100.0;
+        let (remaining_days, daily_average, estimated_end_of_month, percentage) = self.month_stats(now, current_usage);
 
         let mut report = format!(
             "Traffic Monitoring System - Daily Traffic Report\n\n\
@@ -206,7 +284,7 @@ impl TrafficMonitor {
              Yesterday's Traffic Usage:\n\
              ----------------------\n\
              Yesterday's Total Usage: {:.2}GB\n",
-            now.format("%Y-%m-%d"),
+            now.date_naive(),
             yesterday_usage
         );
 
@@ -214,7 +292,8 @@ impl TrafficMonitor {
             report.push_str("⚠️ Yesterday's traffic was high!\n");
         }
 
-        report.push_str(&format!(
+        let _ = write!(
+            report,
             "\nCurrent Month Cumulative Traffic Usage:\n\
              ----------------------\n\
              Current Month Total: {:.2}GB / {}GB ({:.1}%)\n\
@@ -222,19 +301,17 @@ impl TrafficMonitor {
              Remaining Days: {} days\n\
              Month-End Estimate: {:.2}GB\n",
             current_usage, self.total_limit, percentage, daily_average, remaining_days, estimated_end_of_month
-        ));
+        );
 
         if self.monitor_config.reporting.include_traffic_trend && !daily_usage.is_empty() {
             report.push_str("\nTraffic Trend:\n----------------------\nLast 7 Days Traffic Trend:\n");
-            for i in (1..=7).rev() {
-                let date = (now - ChronoDuration::days(i)).format("%Y-%m-%d").to_string();
-                let usage = daily_usage.get(&date).copied().unwrap_or(0.0);
-                report.push_str(&format!("- {}: {:.2}GB\n", date, usage));
+            for (date, usage) in trend_days(now.date_naive(), &daily_usage) {
+                let _ = writeln!(report, "- {}: {:.2}GB", date, usage);
             }
         }
 
         if percentage > 70.0 {
-            report.push_str(&format!("\n⚠️ Warning: Current traffic has used {:.1}% of monthly quota!\n", percentage));
+            let _ = writeln!(report, "\n⚠️ Warning: Current traffic has used {:.1}% of monthly quota!", percentage);
         }
 
         if estimated_end_of_month > self.total_limit {
@@ -242,10 +319,11 @@ impl TrafficMonitor {
         }
 
         if current_usage >= self.critical_threshold {
-            report.push_str(&format!(
+            let _ = write!(
+                report,
                 "\n🔴 Critical Warning: Shutdown threshold reached ({}%)! System may shut down at any time.\n",
                 self.threshold_config.critical_percentage
-            ));
+            );
         }
 
         report.push_str("\nThis is an automated traffic report, please do not reply.");
@@ -260,13 +338,8 @@ impl TrafficMonitor {
 
         match self.data_provider.get_current_month_usage() {
             Ok(current_usage) => {
-                let summary = self.get_status_summary(current_usage);
-                let mut level = "info";
-                if current_usage >= self.critical_threshold {
-                    level = "critical";
-                } else if current_usage >= self.total_limit * 0.7 {
-                    level = "warning";
-                }
+                let summary = self.get_status_summary(current_usage, &Local::now());
+                let level = self.pick_level(current_usage);
 
                 let percentage = (current_usage / self.total_limit) * 100.0;
                 let subject = format!(
@@ -274,8 +347,8 @@ impl TrafficMonitor {
                     current_usage, percentage
                 );
 
-                self.notifier.notify(&subject, &summary, level);
-                info!("System startup notification sent");
+                self.notify_async(subject, summary, level);
+                info!("System startup notification queued");
             }
             Err(e) => {
                 error!("Error sending startup notification: {}", e);
@@ -283,13 +356,12 @@ impl TrafficMonitor {
         }
     }
 
-    pub fn send_daily_report(&mut self) {
+    pub fn send_daily_report(&mut self, current_usage: f64, now: &DateTime<Local>) {
         if !self.monitor_config.reporting.enable_daily_report {
             return;
         }
 
-        let now = Local::now();
-        let today_str = now.format("%Y-%m-%d").to_string();
+        let today_str = now.date_naive().to_string();
 
         if let Some(last_report) = self.state_manager.get_last_daily_report_date() {
             if last_report == today_str {
@@ -297,33 +369,23 @@ impl TrafficMonitor {
             }
         }
 
-        if now.hour() == self.monitor_config.reporting.daily_report_hour {
-            match self.data_provider.get_current_month_usage() {
-                Ok(current_usage) => {
-                    let report_body = self.get_daily_report();
-                    let mut level = "info";
-                    if current_usage >= self.critical_threshold {
-                        level = "critical";
-                    } else if current_usage >= self.total_limit * 0.7 {
-                        level = "warning";
-                    }
+        // Any time after the report hour counts, so a late wakeup or a failed
+        // send earlier in the day does not skip the report.
+        if now.hour() >= self.monitor_config.reporting.daily_report_hour {
+            let report_body = self.get_daily_report(current_usage, now);
+            let level = self.pick_level(current_usage);
 
-                    let percentage = (current_usage / self.total_limit) * 100.0;
-                    let subject = format!(
-                        "Traffic Daily Report - {} - Usage: {:.2}GB ({:.1}%)",
-                        today_str, current_usage, percentage
-                    );
-
-                    if self.notifier.notify(&subject, &report_body, level) {
-                        if let Err(e) = self.state_manager.set_last_daily_report_date(today_str) {
-                            error!("Failed to save daily report date to state: {}", e);
-                        }
-                        info!("Daily traffic report sent");
-                    }
-                }
-                Err(e) => {
-                    error!("Error sending daily report: {}", e);
+            let percentage = (current_usage / self.total_limit) * 100.0;
+            let subject = format!(
+                "Traffic Daily Report - {} - Usage: {:.2}GB ({:.1}%)",
+                today_str, current_usage, percentage
+            );
+
+            if self.notifier.notify(&subject, &report_body, level) {
+                if let Err(e) = self.state_manager.set_last_daily_report_date(today_str) {
+                    error!("Failed to save daily report date to state: {}", e);
                 }
+                info!("Daily traffic report sent");
             }
         }
     }
@@ -332,20 +394,43 @@ impl TrafficMonitor {
         let current_usage = self.data_provider.get_current_month_usage()?;
         debug!("Current month usage: {}GB", current_usage);
 
-        // Check if we need to send daily report
-        self.send_daily_report();
-
-        // Check warning interval thresholds
-        while let Some(threshold) = self.should_notify(current_usage) {
-            info!("Threshold reached: {}GB", threshold);
-            let subject = format!("Traffic Alert: {}GB threshold reached", threshold);
-            let message = format!(
-                "Your network traffic has reached {}GB out of your {}GB limit. Current usage: {:.2}GB.",
-                threshold, self.total_limit, current_usage
-            );
+        // State changes made during a tick are written to disk once, at the end
+        self.state_manager.begin_batch();
+        let result = self.evaluate_usage(current_usage);
+        let flushed = self.state_manager.end_batch();
+        result.and(flushed)
+    }
 
-            self.notifier.notify(&subject, &message, "warning");
-            self.state_manager.add_notified_threshold(threshold)?;
+    fn evaluate_usage(&mut self, current_usage: f64) -> Result<(), Box<dyn std::error::Error>> {
+        // Check if we need to send daily report
+        self.send_daily_report(current_usage, &Local::now());
+
+        // Check warning interval thresholds. Several can be crossed at once
+        // (e.g. after downtime); they go out as one alert and one state write.
+        let crossed = self.should_notify(current_usage);
+        if let Some(&highest) = crossed.last() {
+            info!("Thresholds reached: {:?}GB", crossed);
+            let (subject, message) = if crossed.len() == 1 {
+                (
+                    format!("Traffic Alert: {}GB threshold reached", highest),
+                    format!(
+                        "Your network traffic has reached {}GB out of your {}GB limit. Current usage: {:.2}GB.",
+                        highest, self.total_limit, current_usage
+                    ),
+                )
+            } else {
+                let list = crossed.iter().map(|t| format!("{}GB", t)).collect::<Vec<_>>().join(", ");
+                (
+                    format!("Traffic Alert: {}GB threshold reached ({} thresholds crossed)", highest, crossed.len()),
+                    format!(
+                        "Your network traffic has crossed the {} thresholds out of your {}GB limit. Current usage: {:.2}GB.",
+                        list, self.total_limit, current_usage
+                    ),
+                )
+            };
+
+            self.notify_async(subject, message, "warning");
+            self.state_manager.add_notified_thresholds(&crossed)?;
         }
 
         // Check critical threshold
@@ -362,8 +447,11 @@ impl TrafficMonitor {
                 self.total_limit
             );
 
+            // Sent inline: the shutdown below must not race the alert out.
             self.notifier.notify(subject, &message, "critical");
             self.state_manager.set_critical_notification_sent(true)?;
+            // Persist before shutting down so the alert is not repeated after reboot
+            self.state_manager.flush()?;
 
             error!("Executing shutdown action");
             self.action.execute();
@@ -383,12 +471,96 @@ impl TrafficMonitor {
 
         self.send_startup_notification();
 
-        let sleep_duration = Duration::from_secs(self.monitor_config.check_interval);
+        // Checks are scheduled on fixed deadlines so the time spent in
+        // check_traffic (vnstat, webhooks, SMTP) does not push later checks back.
+        // The sleep is cut short when the daily report hour comes up first.
+        let check_interval = Duration::from_secs(self.monitor_config.check_interval);
+        let mut next_check = Instant::now();
         loop {
+            let check_due = Instant::now() >= next_check;
             if let Err(e) = self.check_traffic() {
                 error!("Error during traffic check: {}", e);
             }
-            thread::sleep(sleep_duration);
+
+            let now = Instant::now();
+            if check_due {
+                next_check += check_interval;
+                if next_check < now {
+                    // Overran one or more slots (slow check or suspended host); run
+                    // once now and resume the schedule from here rather than bursting.
+                    next_check = now;
+                }
+            }
+
+            let wake = match self.time_until_daily_report() {
+                Some(until_report) => next_check.min(now + until_report),
+                None => next_check,
+            };
+            thread::sleep(wake.saturating_duration_since(now));
+        }
+    }
+
+    /// Time until the next `daily_report_hour:00`, or `None` when daily
+    /// reports are disabled.
+    fn time_until_daily_report(&self) -> Option<Duration> {
+        let reporting = &self.monitor_config.reporting;
+        if !reporting.enable_daily_report {
+            return None;
+        }
+        let now = Local::now().naive_local();
+        let mut target = now.date().and_hms_opt(reporting.daily_report_hour, 0, 0)?;
+        if target <= now {
+            target += ChronoDuration::days(1);
+        }
+        (target - now).to_std().ok()
+    }
+}
+
+impl Drop for TrafficMonitor {
+    fn drop(&mut self) {
+        // Closing the channel lets the worker drain what is queued and exit,
+        // so `--once` runs still deliver their notifications.
+        self.notify_tx.take();
+        if let Some(worker) = self.notify_worker.take() {
+            let _ = worker.join();
         }
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn ladder(total_limit: u64, interval: u64) -> Vec<u64> {
+        threshold_ladder(&ThresholdConfig { total_limit, interval, ..ThresholdConfig::default() })
+    }
+
+    #[test]
+    fn test_threshold_ladder() {
+        assert_eq!(ladder(300, 100), vec![100, 200, 300]);
+        // A limit that is not a multiple of the interval stops at the last full step
+        assert_eq!(ladder(250, 100), vec![100, 200]);
+        assert!(ladder(300, 0).is_empty());
+    }
+
+    #[test]
+    fn test_crossed_count_boundaries() {
+        let thresholds = ladder(300, 100);
+        assert_eq!(crossed_count(&thresholds, 100.0, 0.0), 0);
+        assert_eq!(crossed_count(&thresholds, 100.0, 99.99), 0);
+        assert_eq!(crossed_count(&thresholds, 100.0, 100.0), 1);
+        assert_eq!(crossed_count(&thresholds, 100.0, 199.99), 1);
+        assert_eq!(crossed_count(&thresholds, 100.0, 200.0), 2);
+        assert_eq!(crossed_count(&thresholds, 100.0, 300.0), 3);
+        // Usage beyond total_limit never reaches past the ladder
+        assert_eq!(crossed_count(&thresholds, 100.0, 1000.0), 3);
+        assert_eq!(crossed_count(&ladder(250, 100), 100.0, 260.0), 2);
+    }
+
+    #[test]
+    fn test_crossed_count_zero_interval() {
+        assert_eq!(crossed_count(&ladder(300, 0), 0.0, 500.0), 0);
+        // Guarded even if a ladder is passed with a zero interval
+        assert_eq!(crossed_count(&[100, 200], 0.0, 500.0), 0);
+    }
+}
@@ -1,7 +1,15 @@
-use std::collections::HashMap;
+use std::sync::Mutex;
+use std::thread;
+use std::time::Duration;
 use log::{debug, error, info, warn};
 use chrono::Local;
-use serde_json::json;
+use serde::Serialize;
+use lettre::Message;
+use lettre::message::{Mailbox, MultiPart, SinglePart};
+use lettre::transport::smtp;
+use lettre::transport::smtp::authentication::{Credentials, Mechanism};
+use lettre::transport::smtp::client::{SmtpConnection, TlsParameters};
+use lettre::transport::smtp::extension::ClientId;
 
 use crate::config::{DiscordConfig, EmailConfig};
 
@@ -9,17 +17,143 @@ pub trait Notifier: Send + Sync {
     fn notify(&self, subject: &str, message: &str, level: &str) -> bool;
 }
 
+// Webhook body serialized straight from borrowed fields, without building a
+// serde_json::Value tree of owned copies first.
+#[derive(Serialize)]
+struct WebhookPayload<'a> {
+    username: &'a str,
+    avatar_url: Option<&'a str>,
+    embeds: [Embed<'a>; 1],
+}
+
+#[derive(Serialize)]
+struct Embed<'a> {
+    title: &'a str,
+    description: &'a str,
+    color: u32,
+    footer: EmbedFooter<'a>,
+    timestamp: &'a str,
+}
+
+#[derive(Serialize)]
+struct EmbedFooter<'a> {
+    text: &'a str,
+}
+
+fn level_color(level: &str) -> u32 {
+    match level {
+        "warning" => 16098851,  // Orange/Yellow
+        "critical" => 15746887, // Red
+        _ => 3447003,           // Blue (info and unknown levels)
+    }
+}
+
+#[derive(Debug, Clone, Copy, PartialEq)]
+enum TemplateField {
+    Message,
+    LevelEmoji,
+    TrafficEmoji,
+    Time,
+    StatusEmoji,
+}
+
+const TEMPLATE_FIELDS: [(&str, TemplateField); 5] = [
+    ("{message}", TemplateField::Message),
+    ("{level_emoji}", TemplateField::LevelEmoji),
+    ("{traffic_emoji}", TemplateField::TrafficEmoji),
+    ("{time}", TemplateField::Time),
+    ("{status_emoji}", TemplateField::StatusEmoji),
+];
+
+#[derive(Debug, PartialEq)]
+enum TemplatePart {
+    Literal(String),
+    Field(TemplateField),
+}
+
+/// Split a message template into literal text and placeholders once, so each
+/// notification renders it in a single pass.
+fn parse_template(template: &str) -> Vec<TemplatePart> {
+    let mut parts = Vec::new();
+    let mut literal_start = 0;
+    let mut pos = 0;
+    while let Some(offset) = template[pos..].find('{') {
+        let brace = pos + offset;
+        match TEMPLATE_FIELDS.iter().find(|(name, _)| template[brace..].starts_with(name)) {
+            Some((name, field)) => {
+                if literal_start < brace {
+                    parts.push(TemplatePart::Literal(template[literal_start..brace].to_string()));
+                }
+                parts.push(TemplatePart::Field(*field));
+                pos = brace + name.len();
+                literal_start = pos;
+            }
+            None => pos = brace + 1,
+        }
+    }
+    if literal_start < template.len() {
+        parts.push(TemplatePart::Literal(template[literal_start..].to_string()));
+    }
+    parts
+}
+
+/// Render a parsed template, taking each placeholder's text from `value`.
+/// Substituted values are copied verbatim, so placeholders that appear inside
+/// them (e.g. a `{time}` in the alert message) are not expanded.
+fn render_template<'a>(template: &[TemplatePart], capacity: usize, value: impl Fn(TemplateField) -> &'a str) -> String {
+    let mut rendered = String::with_capacity(capacity);
+    for part in template {
+        match part {
+            TemplatePart::Literal(text) => rendered.push_str(text),
+            TemplatePart::Field(field) => rendered.push_str(value(*field)),
+        }
+    }
+    rendered
+}
+
+/// Case-insensitive search for an ASCII `needle` without lowercasing a copy
+/// of the (possibly multi-KB) haystack.
+fn contains_ignore_ascii_case(haystack: &str, needle: &str) -> bool {
+    let needle = needle.as_bytes();
+    haystack
+        .as_bytes()
+        .windows(needle.len())
+        .any(|window| window.eq_ignore_ascii_case(needle))
+}
+
+const TIME_EMOJI: &str = "⏰";
+
+/// Decorations chosen from the message text and level.
+struct ExtraEmojis {
+    traffic: Option<&'static str>,
+    status: Option<&'static str>,
+}
+
 pub struct DiscordNotifier {
     config: DiscordConfig,
+    // Parsed message_template; None when no template is configured
+    template: Option<Vec<TemplatePart>>,
+    // Reused across notifications so the TLS connection to Discord stays pooled
+    agent: ureq::Agent,
 }
 
 impl DiscordNotifier {
     pub fn new(config: DiscordConfig) -> Self {
-        Self { config }
+        let agent = ureq::AgentBuilder::new()
+            .timeout(Duration::from_secs(10))
+            .max_idle_connections_per_host(1)
+            .build();
+        let template = if config.message_template.is_empty() {
+            None
+        } else {
+            Some(parse_template(&config.message_template))
+        };
+        Self { config, template, agent }
     }
 
+    // `level` is expected to be lowercased already (see `notify`).
     fn get_level_emoji(&self, level: &str) -> &'static str {
-        match level.to_lowercase().as_str() {
+        match level {
             "info" => "📊",
             "warning" => "⚠️",
             "critical" => "🚨",
@@ -27,34 +161,17 @@ impl DiscordNotifier {
         }
     }
 
-    fn get_additional_emojis(&self, level: &str, message: &str) -> HashMap<&'static str, &'static str> {
-        let mut emojis = HashMap::new();
-
-        if message.to_lowercase().contains("traffic") {
-            emojis.insert("traffic", "🚦");
-        }
-        if message.to_lowercase().contains("limit") {
-            emojis.insert("limit", "🔄");
-        }
-        if message.to_lowercase().contains("threshold") {
-            emojis.insert("threshold", "📈");
-        }
-
-        match level.to_lowercase().as_str() {
-            "info" => {
-                emojis.insert("status", "✅");
-            }
-            "warning" => {
-                emojis.insert("status", "⚠️");
-            }
-            "critical" => {
-                emojis.insert("status", "❌");
-            }
-            _ => {}
+    fn get_additional_emojis(&self, level: &str, message: &str) -> ExtraEmojis {
+        let status = match level {
+            "info" => Some("✅"),
+            "warning" => Some("⚠️"),
+            "critical" => Some("❌"),
+            _ => None,
+        };
+        ExtraEmojis {
+            traffic: contains_ignore_ascii_case(message, "traffic").then_some("🚦"),
+            status,
         }
-
-        emojis.insert("time", "⏰");
-        emojis
     }
 }
 
@@ -69,163 +186,320 @@ impl Notifier for DiscordNotifier {
             warn!("Using example webhook URL. This will likely fail to send notifications.");
         }
 
-        let colors = {
-            let mut m = HashMap::new();
-            m.insert("info", 3447003);     // Blue
-            m.insert("warning", 16098851); // Orange/Yellow
-            m.insert("critical", 15746887); // Red
-            m
-        };
-        let color = colors.get(level.to_lowercase().as_str()).copied().unwrap_or(3447003);
-        let level_emoji = self.get_level_emoji(level);
-        let emojis = self.get_additional_emojis(level, message);
+        let level_key = level.to_ascii_lowercase();
+        let color = level_color(&level_key);
+        let level_emoji = self.get_level_emoji(&level_key);
+        let emojis = self.get_additional_emojis(&level_key, message);
 
-        let time_emoji = emojis.get("time").copied().unwrap_or("⏰");
-        let time_str = format!("{} {}", time_emoji, Local::now().format("%Y-%m-%d %H:%M:%S"));
+        // One clock read for both the displayed time and the embed timestamp
+        let now = Local::now();
+        let time_str = format!("{} {}", TIME_EMOJI, now.format("%Y-%m-%d %H:%M:%S"));
 
         let mut formatted_message = message.replace("\n\n", "\n");
         let emoji_subject = format!("{} {}", level_emoji, subject);
 
-        if !self.config.message_template.is_empty() {
-            let traffic_emoji = emojis.get("traffic").copied().unwrap_or("");
-            let status_emoji = emojis.get("status").copied().unwrap_or("");
-
-            formatted_message = self.config.message_template
-                .replace("{message}", &formatted_message)
-                .replace("{level_emoji}", level_emoji)
-                .replace("{traffic_emoji}", traffic_emoji)
-                .replace("{time}", &time_str)
-                .replace("{status_emoji}", status_emoji);
+        if let Some(template) = &self.template {
+            let traffic_emoji = emojis.traffic.unwrap_or("");
+            let status_emoji = emojis.status.unwrap_or("");
+
+            let capacity = self.config.message_template.len() + formatted_message.len() + time_str.len();
+            formatted_message = render_template(template, capacity, |field| match field {
+                TemplateField::Message => formatted_message.as_str(),
+                TemplateField::LevelEmoji => level_emoji,
+                TemplateField::TrafficEmoji => traffic_emoji,
+                TemplateField::Time => time_str.as_str(),
+                TemplateField::StatusEmoji => status_emoji,
+            });
         } else {
-            let status_emoji = emojis.get("status").copied().unwrap_or("");
+            let status_emoji = emojis.status.unwrap_or("");
             formatted_message = format!("{}\n\n{} Status as of {}", formatted_message, status_emoji, time_str);
         }
 
-        let traffic_icon = emojis.get("traffic").copied().unwrap_or("🚦");
-        let payload = json!({
-            "username": self.config.username,
-            "avatar_url": if self.config.avatar_url.trim().is_empty() { None } else { Some(&self.config.avatar_url) },
-            "embeds": [{
-                "title": emoji_subject,
-                "description": formatted_message,
-                "color": color,
-                "footer": {
-                    "text": format!("Traffic Monitor {} | {} {}", traffic_icon, level.to_uppercase(), level_emoji)
-                },
-                "timestamp": Local::now().to_rfc3339()
-            }]
-        });
+        let traffic_icon = emojis.traffic.unwrap_or("🚦");
+        let footer_text = format!("Traffic Monitor {} | {} {}", traffic_icon, level.to_uppercase(), level_emoji);
+        let timestamp = now.to_rfc3339();
+        let payload = WebhookPayload {
+            username: &self.config.username,
+            avatar_url: if self.config.avatar_url.trim().is_empty() { None } else { Some(&self.config.avatar_url) },
+            embeds: [Embed {
+                title: &emoji_subject,
+                description: &formatted_message,
+                color,
+                footer: EmbedFooter { text: &footer_text },
+                timestamp: &timestamp,
+            }],
+        };
+
+        // Serialized once so retries resend the same bytes
+        let body = match serde_json::to_vec(&payload) {
+            Ok(body) => body,
+            Err(e) => {
+                error!("Failed to serialize Discord payload: {}", e);
+                return false;
+            }
+        };
 
-        debug!("Sending Discord webhook payload...");
-        match ureq::post(&self.config.webhook_url)
-            .set("Content-Type", "application/json")
-            .timeout(std::time::Duration::from_secs(10))
-            .send_json(payload)
-        {
-            Ok(resp) => {
-                if resp.status() == 200 || resp.status() == 204 {
-                    info!("Sent {} Discord notification with subject '{}'", level, subject);
-                    true
-                } else {
+        for attempt in 1..=DISCORD_MAX_ATTEMPTS {
+            debug!("Sending Discord webhook payload (attempt {}/{})...", attempt, DISCORD_MAX_ATTEMPTS);
+            let result = self.agent
+                .post(&self.config.webhook_url)
+                .set("Content-Type", "application/json")
+                .send_bytes(&body);
+
+            let retry_in = match result {
+                Ok(resp) => {
+                    if resp.status() == 200 || resp.status() == 204 {
+                        info!("Sent {} Discord notification with subject '{}'", level, subject);
+                        return true;
+                    }
                     error!("Failed to send Discord notification: HTTP {} - {}", resp.status(), resp.into_string().unwrap_or_default());
-                    false
+                    return false;
                 }
-            }
-            Err(e) => {
-                error!("Network error sending Discord notification: {}", e);
-                false
+                Err(ureq::Error::Status(code, resp)) if code == 429 || code >= 500 => {
+                    warn!("Discord webhook returned HTTP {}", code);
+                    retry_after(&resp).unwrap_or_else(|| retry_backoff(attempt))
+                }
+                Err(ureq::Error::Status(code, resp)) => {
+                    error!("Failed to send Discord notification: HTTP {} - {}", code, resp.into_string().unwrap_or_default());
+                    return false;
+                }
+                Err(e) => {
+                    warn!("Network error sending Discord notification: {}", e);
+                    retry_backoff(attempt)
+                }
+            };
+
+            if attempt < DISCORD_MAX_ATTEMPTS {
+                debug!("Retrying Discord notification in {:?}", retry_in);
+                thread::sleep(retry_in);
             }
         }
-    }
-}
 
-pub struct EmailNotifier {
-    config: EmailConfig,
+        error!("Giving up on Discord notification '{}' after {} attempts", subject, DISCORD_MAX_ATTEMPTS);
+        false
+    }
 }
 
-impl EmailNotifier {
-    pub fn new(config: EmailConfig) -> Result<Self, Box<dyn std::error::Error>> {
-        if config.smtp_server.is_empty() || config.smtp_port == 0 || config.sender.is_empty() || config.recipients.is_empty() {
-            return Err("Missing required email configuration".into());
-        }
-        Ok(Self { config })
+// Transient failures (429 rate limits, 5xx, network errors) are retried a few
+// times so a single hiccup does not lose an alert.
+const DISCORD_MAX_ATTEMPTS: u32 = 3;
+const DISCORD_MAX_RETRY_WAIT: Duration = Duration::from_secs(10);
+
+/// Delay requested by the `Retry-After` header (seconds, possibly fractional),
+/// capped at `DISCORD_MAX_RETRY_WAIT`.
+fn retry_after(resp: &ureq::Response) -> Option<Duration> {
+    let secs: f64 = resp.header("Retry-After")?.trim().parse().ok()?;
+    if !secs.is_finite() || secs < 0.0 {
+        return None;
     }
+    Some(Duration::from_secs_f64(secs).min(DISCORD_MAX_RETRY_WAIT))
 }
 
-impl Notifier for EmailNotifier {
-    fn notify(&self, subject: &str, message: &str, level: &str) -> bool {
-        if !self.config.enabled {
-            debug!("Email notifications are disabled, skipping");
-            return false;
-        }
-
-        if self.config.recipients.is_empty() {
-            warn!("No recipients configured, skipping email notification");
-            return false;
-        }
-
-        let color = match level.to_lowercase().as_str() {
-            "info" => "#2196F3",
-            "warning" => "#FF9800",
-            "critical" => "#F44336",
-            _ => "#2196F3",
-        };
+fn retry_backoff(attempt: u32) -> Duration {
+    Duration::from_millis(500 << (attempt - 1)).min(DISCORD_MAX_RETRY_WAIT)
+}
 
-        let formatted_message = message.replace("\n", "<br>");
-        let html_content = format!(
-            r#"<html>
+const EMAIL_HTML_HEAD: &str = r#"<html>
 <head>
     <style>
-        body {{ font-family: Arial, sans-serif; line-height: 1.6; }}
-        .message {{ padding: 20px; border-left: 4px solid {}; background-color: #f8f8f8; }}
-        .footer {{ font-size: 12px; color: #666; margin-top: 20px; }}
+        body { font-family: Arial, sans-serif; line-height: 1.6; }
+        .message { padding: 20px; border-left: 4px solid "#;
+const EMAIL_HTML_BODY: &str = r#"; background-color: #f8f8f8; }
+        .footer { font-size: 12px; color: #666; margin-top: 20px; }
     </style>
 </head>
 <body>
     <div class="message">
-        {}
+        "#;
+const EMAIL_HTML_TAIL: &str = r#"
     </div>
     <div class="footer">
         This is an automated message from the Traffic Monitor system.
     </div>
 </body>
-</html>"#,
-            color, formatted_message
-        );
+</html>"#;
+
+fn email_color(level: &str) -> &'static str {
+    if level.eq_ignore_ascii_case("warning") {
+        "#FF9800"
+    } else if level.eq_ignore_ascii_case("critical") {
+        "#F44336"
+    } else {
+        "#2196F3" // info and unknown levels
+    }
+}
 
-        use lettre::message::{MultiPart, SinglePart, Mailbox};
-        use lettre::{Message, SmtpTransport, Transport};
-        use lettre::transport::smtp::authentication::Credentials;
+/// Render the HTML alternative in one preallocated buffer, escaping the
+/// message and turning newlines into `<br>` as it is copied.
+fn render_email_html(level: &str, message: &str) -> String {
+    let mut html = String::with_capacity(
+        EMAIL_HTML_HEAD.len() + EMAIL_HTML_BODY.len() + EMAIL_HTML_TAIL.len() + 7 + message.len() * 2,
+    );
+    html.push_str(EMAIL_HTML_HEAD);
+    html.push_str(email_color(level));
+    html.push_str(EMAIL_HTML_BODY);
+    for c in message.chars() {
+        match c {
+            '\n' => html.push_str("<br>"),
+            '&' => html.push_str("&amp;"),
+            '<' => html.push_str("&lt;"),
+            '>' => html.push_str("&gt;"),
+            _ => html.push(c),
+        }
+    }
+    html.push_str(EMAIL_HTML_TAIL);
+    html
+}
 
-        let parsed_sender = match self.config.sender.parse::<Mailbox>() {
-            Ok(s) => s,
-            Err(e) => {
-                error!("Invalid email sender format: {}", e);
-                return false;
-            }
+// Same command timeout and AUTH mechanisms lettre's SmtpTransport uses
+const SMTP_TIMEOUT: Duration = Duration::from_secs(60);
+const SMTP_AUTH_MECHANISMS: &[Mechanism] = &[Mechanism::Plain, Mechanism::Login];
+
+/// An authenticated SMTP connection and the number of messages sent on it.
+struct SmtpSession {
+    conn: SmtpConnection,
+    sent: u32,
+}
+
+pub struct EmailNotifier {
+    config: EmailConfig,
+    // Prepared once at startup rather than for every notification
+    tls_parameters: TlsParameters,
+    credentials: Credentials,
+    hello_name: ClientId,
+    // Authenticated session kept open between notifications, so only the
+    // first send (or one after the server dropped us) pays for TCP, TLS
+    // and AUTH. It is recycled after max_messages_per_connection sends.
+    session: Mutex<Option<SmtpSession>>,
+    // Addresses are parsed and validated once, at construction.
+    sender: Mailbox,
+    recipients: Vec<Mailbox>,
+}
+
+impl EmailNotifier {
+    pub fn new(config: EmailConfig) -> Result<Self, Box<dyn std::error::Error>> {
+        if config.smtp_server.is_empty() || config.smtp_port == 0 || config.sender.is_empty() || config.recipients.is_empty() {
+            return Err("Missing required email configuration".into());
+        }
+
+        let credentials = Credentials::new(config.username.clone(), config.password.clone());
+        let tls_parameters = TlsParameters::new(config.smtp_server.clone())
+            .map_err(|e| format!("Failed to construct SMTP TLS parameters: {}", e))?;
+
+        let sender = config
+            .sender
+            .parse::<Mailbox>()
+            .map_err(|e| format!("Invalid email sender format: {}", e))?;
+        let recipients = config
+            .recipients
+            .iter()
+            .map(|rec| {
+                rec.parse::<Mailbox>()
+                    .map_err(|e| format!("Invalid email recipient format '{}': {}", rec, e))
+            })
+            .collect::<Result<Vec<_>, _>>()?;
+
+        Ok(Self {
+            config,
+            tls_parameters,
+            credentials,
+            hello_name: ClientId::default(),
+            session: Mutex::new(None),
+            sender,
+            recipients,
+        })
+    }
+
+    /// Open and authenticate a new SMTP session.
+    fn connect(&self) -> Result<SmtpConnection, smtp::Error> {
+        let server = (self.config.smtp_server.as_str(), self.config.smtp_port);
+        let mut conn = if self.config.use_tls {
+            // Port 465 SSL/TLS connection
+            SmtpConnection::connect(server, Some(SMTP_TIMEOUT), &self.hello_name, Some(&self.tls_parameters), None)?
+        } else {
+            // Port 587 STARTTLS connection
+            let mut conn = SmtpConnection::connect(server, Some(SMTP_TIMEOUT), &self.hello_name, None, None)?;
+            conn.starttls(&self.tls_parameters, &self.hello_name)?;
+            conn
         };
+        conn.auth(SMTP_AUTH_MECHANISMS, &self.credentials)?;
+        Ok(conn)
+    }
 
-        let mut builder = Message::builder().from(parsed_sender);
-        for rec in &self.config.recipients {
-            match rec.parse::<Mailbox>() {
-                Ok(r) => {
-                    builder = builder.to(r);
-                }
-                Err(e) => {
-                    error!("Invalid email recipient format '{}': {}", rec, e);
-                    return false;
-                }
+    /// Send `email` over the held session, opening one if there is none, the
+    /// server no longer answers NOOP, or the per-connection message cap was
+    /// reached. A failure on a reused session is retried once on a fresh
+    /// connection.
+    fn send(&self, email: &Message) -> Result<(), smtp::Error> {
+        let envelope = email.envelope();
+        let body = email.formatted();
+        let mut session = self.session.lock().unwrap_or_else(|e| e.into_inner());
+
+        let max_messages = self.config.max_messages_per_connection.max(1);
+        if let Some(mut spent) = session.take_if(|s| s.sent >= max_messages) {
+            debug!("Closing SMTP connection after {} messages", spent.sent);
+            let _ = spent.conn.quit();
+        }
+        let healthy = session.as_mut().is_some_and(|s| s.conn.test_connected());
+        if !healthy {
+            *session = Some(SmtpSession { conn: self.connect()?, sent: 0 });
+        }
+        let current = session.as_mut().expect("session was just opened");
+        match current.conn.send(envelope, &body) {
+            Ok(_) => {
+                current.sent += 1;
+                Ok(())
+            }
+            Err(e) if healthy => {
+                warn!("SMTP send on reused connection failed ({}), reconnecting", e);
+                *session = None;
+                let mut conn = self.connect()?;
+                conn.send(envelope, &body)?;
+                *session = Some(SmtpSession { conn, sent: 1 });
+                Ok(())
+            }
+            Err(e) => {
+                *session = None;
+                Err(e)
             }
         }
+    }
+}
 
-        let email_msg = match builder
-            .subject(subject)
-            .multipart(
+impl Drop for EmailNotifier {
+    fn drop(&mut self) {
+        let session = self.session.get_mut().unwrap_or_else(|e| e.into_inner());
+        if let Some(mut spent) = session.take() {
+            let _ = spent.conn.quit();
+        }
+    }
+}
+
+impl Notifier for EmailNotifier {
+    fn notify(&self, subject: &str, message: &str, level: &str) -> bool {
+        if !self.config.enabled {
+            debug!("Email notifications are disabled, skipping");
+            return false;
+        }
+
+        let mut builder = Message::builder().from(self.sender.clone());
+        for rec in &self.recipients {
+            builder = builder.to(rec.clone());
+        }
+
+        // Info mail (startup and daily reports) goes out as plain text only;
+        // the HTML alternative is kept for warning and critical alerts.
+        let builder = builder.subject(subject);
+        let built = if level.eq_ignore_ascii_case("info") {
+            builder.singlepart(SinglePart::plain(message.to_string()))
+        } else {
+            builder.multipart(
                 MultiPart::alternative()
                     .singlepart(SinglePart::plain(message.to_string()))
-                    .singlepart(SinglePart::html(html_content))
+                    .singlepart(SinglePart::html(render_email_html(level, message)))
             )
-        {
+        };
+        let email_msg = match built {
             Ok(msg) => msg,
             Err(e) => {
                 error!("Failed to build email message: {}", e);
@@ -233,30 +507,9 @@ impl Notifier for EmailNotifier {
             }
         };
 
-        let creds = Credentials::new(self.config.username.clone(), self.config.password.clone());
-
-        // Connect and send
-        let transport_res = if self.config.use_tls {
-            // Port 465 SSL/TLS connection
-            SmtpTransport::relay(&self.config.smtp_server)
-                .map(|t| t.port(self.config.smtp_port).credentials(creds).build())
-        } else {
-            // Port 587 STARTTLS or unencrypted connection
-            SmtpTransport::starttls_relay(&self.config.smtp_server)
-                .map(|t| t.port(self.config.smtp_port).credentials(creds).build())
-        };
-
-        let transport = match transport_res {
-            Ok(t) => t,
-            Err(e) => {
-                error!("Failed to construct SMTP transport: {}", e);
-                return false;
-            }
-        };
-
-        match transport.send(&email_msg) {
+        match self.send(&email_msg) {
             Ok(_) => {
-                info!("Sent {} email notification with subject '{}' to {} recipients", level, subject, self.config.recipients.len());
+                info!("Sent {} email notification with subject '{}' to {} recipients", level, subject, self.recipients.len());
                 true
             }
             Err(e) => {
@@ -288,12 +541,78 @@ impl Notifier for MultiNotifier {
             return false;
         }
 
-        let mut success = false;
-        for notifier in &self.notifiers {
-            if notifier.notify(subject, message, level) {
-                success = true;
-            }
+        if let [notifier] = self.notifiers.as_slice() {
+            return notifier.notify(subject, message, level);
         }
-        success
+
+        // Channels are independent, so send on all of them at once; the call
+        // then takes as long as the slowest channel rather than their sum.
+        thread::scope(|scope| {
+            let handles: Vec<_> = self
+                .notifiers
+                .iter()
+                .map(|notifier| scope.spawn(move || notifier.notify(subject, message, level)))
+                .collect();
+            handles
+                .into_iter()
+                .fold(false, |success, handle| handle.join().unwrap_or(false) || success)
+        })
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn literal(text: &str) -> TemplatePart {
+        TemplatePart::Literal(text.to_string())
+    }
+
+    #[test]
+    fn test_parse_template_fields() {
+        let parts = parse_template("{level_emoji} **Alert** {message} {time}");
+        assert_eq!(
+            parts,
+            vec![
+                TemplatePart::Field(TemplateField::LevelEmoji),
+                literal(" **Alert** "),
+                TemplatePart::Field(TemplateField::Message),
+                literal(" "),
+                TemplatePart::Field(TemplateField::Time),
+            ]
+        );
+    }
+
+    #[test]
+    fn test_parse_template_keeps_unknown_braces_literal() {
+        assert_eq!(parse_template("{x} {{message}} {"), vec![
+            literal("{x} {"),
+            TemplatePart::Field(TemplateField::Message),
+            literal("} {"),
+        ]);
+        assert_eq!(parse_template("no placeholders"), vec![literal("no placeholders")]);
+        assert!(parse_template("").is_empty());
+    }
+
+    #[test]
+    fn test_parse_template_multibyte_text() {
+        assert_eq!(parse_template("流量 {traffic_emoji}📊{status_emoji}é"), vec![
+            literal("流量 "),
+            TemplatePart::Field(TemplateField::TrafficEmoji),
+            literal("📊"),
+            TemplatePart::Field(TemplateField::StatusEmoji),
+            literal("é"),
+        ]);
+    }
+
+    #[test]
+    fn test_render_template_does_not_expand_values() {
+        let template = parse_template("{message} at {time}");
+        let rendered = render_template(&template, 0, |field| match field {
+            TemplateField::Message => "usage {time} {message}",
+            TemplateField::Time => "12:00",
+            _ => "",
+        });
+        assert_eq!(rendered, "usage {time} {message} at 12:00");
     }
 }
@@ -1,35 +1,51 @@
 use serde::{Deserialize, Serialize};
+use std::collections::BTreeSet;
 use std::fs;
 use std::path::{Path, PathBuf};
-use chrono::Local;
+use chrono::{DateTime, Datelike, Local};
+
+use crate::fs_util::write_atomic;
+
+/// "YYYY-MM" key for the month containing `now`.
+fn month_key(now: &DateTime<Local>) -> String {
+    format!("{:04}-{:02}", now.year(), now.month())
+}
 
 #[derive(Debug, Serialize, Deserialize, Clone)]
 pub struct State {
     pub version: String,
     pub last_updated: String,
     pub current_month: String,
-    pub notified_thresholds: Vec<u64>,
+    pub notified_thresholds: BTreeSet<u64>, // serialized as a sorted array
     pub critical_notification_sent: bool,
     pub last_daily_report_date: Option<String>,
 }
 
-impl Default for State {
-    fn default() -> Self {
-        let now = Local::now();
+impl State {
+    /// Fresh state for the month containing `now`.
+    fn new_at(now: &DateTime<Local>) -> Self {
         Self {
             version: "1.0".to_string(),
             last_updated: now.to_rfc3339(),
-            current_month: now.format("%Y-%m").to_string(),
-            notified_thresholds: Vec::new(),
+            current_month: month_key(now),
+            notified_thresholds: BTreeSet::new(),
             critical_notification_sent: false,
             last_daily_report_date: None,
         }
     }
 }
 
+impl Default for State {
+    fn default() -> Self {
+        Self::new_at(&Local::now())
+    }
+}
+
 pub struct StateManager {
     state_file: PathBuf,
     state: State,
+    batching: bool, // defer writes until end_batch
+    dirty: bool,    // in-memory state differs from the file
 }
 
 fn get_home_dir() -> Option<PathBuf> {
@@ -49,42 +65,42 @@ impl StateManager {
             }
         };
 
-        if let Some(parent) = path.parent() {
-            fs::create_dir_all(parent)?;
-        }
-
+        // One clock read covers construction, month validation and the first write
+        let now = Local::now();
         let mut manager = Self {
             state_file: path,
-            state: State::default(),
+            state: State::new_at(&now),
+            batching: false,
+            dirty: false,
         };
 
-        manager.load_state()?;
+        manager.load_state(&now)?;
         Ok(manager)
     }
 
-    fn load_state(&mut self) -> Result<(), Box<dyn std::error::Error>> {
+    fn load_state(&mut self, now: &DateTime<Local>) -> Result<(), Box<dyn std::error::Error>> {
         if !self.state_file.exists() {
-            self.state = State::default();
+            // `self.state` is still the fresh state built in `new`
             self.save_state()?;
             return Ok(());
         }
 
-        let content = fs::read_to_string(&self.state_file)?;
-        match serde_json::from_str::<State>(&content) {
+        // Parse straight from the raw bytes; serde_json validates UTF-8 itself
+        let content = fs::read(&self.state_file)?;
+        match serde_json::from_slice::<State>(&content) {
             Ok(loaded_state) => {
-                self.state = self.validate_state(loaded_state);
+                self.state = self.validate_state(loaded_state, now);
             }
             Err(_) => {
-                self.state = State::default();
+                self.state = State::new_at(now);
                 self.save_state()?;
             }
         }
         Ok(())
     }
 
-    fn validate_state(&self, mut state: State) -> State {
-        let now = Local::now();
-        let current_month = now.format("%Y-%m").to_string();
+    fn validate_state(&self, mut state: State, now: &DateTime<Local>) -> State {
+        let current_month = month_key(now);
 
         if state.current_month != current_month {
             state.current_month = current_month;
@@ -97,20 +113,58 @@ impl StateManager {
     }
 
     fn save_state(&mut self) -> Result<(), Box<dyn std::error::Error>> {
+        self.dirty = true;
+        if self.batching {
+            return Ok(());
+        }
+        self.flush()
+    }
+
+    /// Defer state file writes until `end_batch`, so several updates in one
+    /// monitor tick cost a single write.
+    pub fn begin_batch(&mut self) {
+        self.batching = true;
+    }
+
+    pub fn end_batch(&mut self) -> Result<(), Box<dyn std::error::Error>> {
+        self.batching = false;
+        self.flush()
+    }
+
+    /// Write pending changes now, even inside a batch.
+    pub fn flush(&mut self) -> Result<(), Box<dyn std::error::Error>> {
+        if !self.dirty {
+            return Ok(());
+        }
         self.state.last_updated = Local::now().to_rfc3339();
-        let content = serde_json::to_string_pretty(&self.state)?;
-        fs::write(&self.state_file, content)?;
+        let content = serde_json::to_vec_pretty(&self.state)?;
+        // Atomic replace: a crash mid-write must not leave a truncated state file.
+        // The directory is only created when the first write finds it missing.
+        match write_atomic(&self.state_file, &content) {
+            Err(e) if e.kind() == std::io::ErrorKind::NotFound => {
+                if let Some(parent) = self.state_file.parent() {
+                    fs::create_dir_all(parent)?;
+                }
+                write_atomic(&self.state_file, &content)?;
+            }
+            result => result?,
+        }
+        self.dirty = false;
         Ok(())
     }
 
-    pub fn get_notified_thresholds(&self) -> &[u64] {
+    /// Thresholds already notified this month, in ascending order.
+    pub fn get_notified_thresholds(&self) -> &BTreeSet<u64> {
         &self.state.notified_thresholds
     }
 
-    pub fn add_notified_threshold(&mut self, threshold: u64) -> Result<(), Box<dyn std::error::Error>> {
-        if !self.state.notified_thresholds.contains(&threshold) {
-            self.state.notified_thresholds.push(threshold);
-            self.state.notified_thresholds.sort();
+    /// Record several thresholds at once, writing the state file only once.
+    pub fn add_notified_thresholds(&mut self, thresholds: &[u64]) -> Result<(), Box<dyn std::error::Error>> {
+        let mut changed = false;
+        for &threshold in thresholds {
+            changed |= self.state.notified_thresholds.insert(threshold);
+        }
+        if changed {
             self.save_state()?;
         }
         Ok(())
@@ -121,6 +175,9 @@ impl StateManager {
     }
 
     pub fn set_critical_notification_sent(&mut self, sent: bool) -> Result<(), Box<dyn std::error::Error>> {
+        if self.state.critical_notification_sent == sent {
+            return Ok(());
+        }
         self.state.critical_notification_sent = sent;
         self.save_state()?;
         Ok(())
@@ -131,6 +188,9 @@ impl StateManager {
     }
 
     pub fn set_last_daily_report_date(&mut self, date_str: String) -> Result<(), Box<dyn std::error::Error>> {
+        if self.state.last_daily_report_date.as_deref() == Some(date_str.as_str()) {
+            return Ok(());
+        }
         self.state.last_daily_report_date = Some(date_str);
         self.save_state()?;
         Ok(())
@@ -138,7 +198,7 @@ impl StateManager {
 
     pub fn reset_monthly_state(&mut self) -> Result<(), Box<dyn std::error::Error>> {
         let now = Local::now();
-        self.state.current_month = now.format("%Y-%m").to_string();
+        self.state.current_month = month_key(&now);
         self.state.notified_thresholds.clear();
         self.state.critical_notification_sent = false;
         self.state.last_daily_report_date = None;